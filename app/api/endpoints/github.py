@@ -1,46 +1,181 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-from app.schemas.github import PRAnalysisRequest
-from app.tasks.review import analyze_pr_task
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.schemas.github import PRAnalysisRequest, BatchAnalysisRequest
+# Tasks are sent by name so the API never imports the worker stack
+from app.tasks.celery_app import celery_app, ANALYZE_PR_TASK, ANALYZE_BATCH_TASK
+from app.services.blob_store import get_blob_store, iter_result
+from app.utils.admission import AdmissionController
+from app.utils.batch_progress import BatchProgress
+from app.utils.repo import parse_repo_url
+import json
+import uuid
 
 router = APIRouter()
 
+# Initialize admission controller
+admission_controller = AdmissionController()
+batch_progress = BatchProgress()
+
+
+async def _stream_results(head: dict, result: dict, summary_key: str):
+    """
+    Return results in the same envelope whether they are inline or offloaded,
+    streaming offloaded results back from the blob store
+    """
+    if not isinstance(result, dict) or "result_ref" not in result:
+        summary = result.get(summary_key) if isinstance(result, dict) else None
+        return {**head, summary_key: summary, "results": result}
+
+    result_ref = result["result_ref"]
+    # Blob stores are blocking, so check outside the event loop
+    if not await run_in_threadpool(get_blob_store().exists, result_ref["key"]):
+        raise HTTPException(status_code=410, detail="Results have expired")
+
+    # Wrap the stored JSON in the response envelope without loading it into memory
+    prefix = json.dumps({**head, summary_key: result[summary_key]})[:-1] + ', "results": '
+
+    def body():
+        yield prefix.encode()
+        yield from iter_result(result_ref)
+        yield b"}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
 
 @router.post("/analyze-pr")
-async def analyze_pr(
-        request: PRAnalysisRequest,
-        background_tasks: BackgroundTasks,
-        db: AsyncSession = Depends(get_db)
-):
+async def analyze_pr(request: PRAnalysisRequest):
+    # Imported lazily to keep aiohttp out of API startup
+    from app.services.github import GitHubService, GitHubNotFoundError, GitHubUpstreamError
+
+    # Estimate work from PR metadata before queueing anything
+    github_service = GitHubService(request.github_token)
+    try:
+        repo = parse_repo_url(request.repo_url)
+        pr_details = await github_service.get_pr_details(repo, request.pr_number)
+    except GitHubNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except GitHubUpstreamError as e:
+        retry_after = e.retry_after or settings.ADMISSION_RETRY_AFTER_SECONDS
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(retry_after)}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    task_id = str(uuid.uuid4())
+    work = admission_controller.estimate_work(pr_details)
+    reservations = {admission_controller.get_tenant(repo): work}
+    queue = admission_controller.get_queue(work)
+    admission_controller.admit(task_id, reservations, queue)
+
     try:
         # Create a new task
-        task_id = analyze_pr_task.delay(
-            repo_url=request.repo_url,
-            pr_number=request.pr_number,
-            github_token=request.github_token
+        celery_app.send_task(
+            ANALYZE_PR_TASK,
+            kwargs={
+                "repo_url": request.repo_url,
+                "pr_number": request.pr_number,
+                "github_token": request.github_token,
+                "admission_id": task_id,
+                "admission_reservations": reservations
+            },
+            task_id=task_id,
+            queue=queue
         )
 
-        return {"task_id": str(task_id), "status": "pending"}
+        return {"task_id": task_id, "status": "pending", "queue": queue, "estimated_work": work}
     except Exception as e:
+        admission_controller.release(task_id, reservations)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/status/{task_id}")
 async def get_status(task_id: str):
     # Get task status from Celery
-    task = analyze_pr_task.AsyncResult(task_id)
+    task = celery_app.AsyncResult(task_id)
     return {"task_id": task_id, "status": task.status}
 
 
 @router.get("/results/{task_id}")
 async def get_results(task_id: str):
     # Get task results from Celery
-    task = analyze_pr_task.AsyncResult(task_id)
+    task = celery_app.AsyncResult(task_id)
 
     if task.status == 'PENDING':
         return {"status": "pending"}
     elif task.status == 'SUCCESS':
-        return {"status": "completed", "results": task.get()}
+        return await _stream_results({"status": "completed"}, task.get(), "summary")
     else:
         return {"status": "failed", "error": str(task.result)}
+
+
+@router.post("/analyze-batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    if not request.prs:
+        raise HTTPException(status_code=400, detail="At least one PR is required")
+    if len(request.prs) > settings.BATCH_MAX_PRS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds the maximum of {settings.BATCH_MAX_PRS} PRs"
+        )
+
+    # Charge a flat per-PR estimate to each tenant in the batch
+    batch_id = str(uuid.uuid4())
+    reservations = {}
+    for pr in request.prs:
+        tenant = admission_controller.get_tenant(parse_repo_url(pr.repo_url))
+        reservations[tenant] = reservations.get(tenant, 0) + settings.ADMISSION_BATCH_PR_WORK
+
+    # A batch larger than a tenant's maximum share could never be admitted
+    for tenant, work in reservations.items():
+        if work > admission_controller.get_max_share(tenant):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch is too large for {tenant}. Please split it into smaller batches."
+            )
+
+    # Batches never share the interactive lanes; low-priority ones get their own queue
+    if request.priority == "low":
+        queue = settings.BATCH_LOW_PRIORITY_QUEUE
+    else:
+        queue = settings.BATCH_QUEUE
+    admission_controller.admit(batch_id, reservations, queue)
+
+    try:
+        celery_app.send_task(
+            ANALYZE_BATCH_TASK,
+            kwargs={
+                "prs": [pr.dict() for pr in request.prs],
+                "github_token": request.github_token,
+                "admission_id": batch_id,
+                "admission_reservations": reservations
+            },
+            task_id=batch_id,
+            queue=queue
+        )
+
+        return {"batch_id": batch_id, "status": "pending", "total_prs": len(request.prs), "queue": queue}
+    except Exception as e:
+        admission_controller.release(batch_id, reservations)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/batch/{batch_id}")
+async def get_batch(batch_id: str):
+    # Get batch status, progress and results from Celery
+    batch = celery_app.AsyncResult(batch_id)
+
+    if batch.status == 'PENDING':
+        # Subtasks report progress outside the batch's own task state
+        progress = batch_progress.get(batch_id)
+        if progress is None:
+            return {"batch_id": batch_id, "status": "pending"}
+        return {"batch_id": batch_id, "status": "processing", "progress": progress}
+    elif batch.status == 'SUCCESS':
+        return await _stream_results({"batch_id": batch_id, "status": "completed"}, batch.get(), "progress")
+    else:
+        return {"batch_id": batch_id, "status": "failed", "error": str(batch.result)}
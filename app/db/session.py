@@ -5,7 +5,7 @@ from app.config import settings
 # Create async engine - note the postgresql+asyncpg:// protocol
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,
+    echo=settings.DATABASE_ECHO,
     future=True
 )
 
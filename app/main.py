@@ -3,7 +3,6 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
 from app.api.endpoints import github
-from app.db.session import init_db
 from app.utils.rate_limiter import RateLimiter
 from app.utils.logger import logger
 import time
@@ -78,7 +77,10 @@ app.include_router(github.router, prefix="/api/v1", tags=["github"])
 @app.on_event("startup")
 async def startup_event():
     logger.info("Application starting up")
-    await init_db()
+    if settings.DATABASE_INIT_ON_STARTUP:
+        # Imported lazily so the database stack only loads when it is needed
+        from app.db.session import init_db
+        await init_db()
 
 
 @app.get("/health")
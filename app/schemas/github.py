@@ -1,11 +1,27 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator
+from app.utils.repo import parse_repo_url
+from typing import Literal, Optional
 
 class PRAnalysisRequest(BaseModel):
     repo_url: str
     pr_number: int
     github_token: Optional[str] = None
 
+class BatchPRItem(BaseModel):
+    repo_url: str
+    pr_number: int
+
+    @field_validator("repo_url")
+    @classmethod
+    def validate_repo_url(cls, value: str) -> str:
+        parse_repo_url(value)
+        return value
+
+class BatchAnalysisRequest(BaseModel):
+    prs: list[BatchPRItem]
+    github_token: Optional[str] = None
+    priority: Literal["normal", "low"] = "normal"
+
 class CodeIssue(BaseModel):
     type: str
     line: int
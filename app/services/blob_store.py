@@ -0,0 +1,170 @@
+from app.config import settings
+from abc import ABC, abstractmethod
+from contextlib import closing
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+import gzip
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore(ABC):
+    """Interface for stores holding compressed review results"""
+
+    name = "base"
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open a blob for reading. Raises KeyError if it does not exist"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def sweep(self, max_age: int) -> int:
+        """Delete blobs older than max_age seconds and return how many were removed"""
+
+
+class LocalBlobStore(BlobStore):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so readers never see a partial blob
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def sweep(self, max_age: int) -> int:
+        cutoff = time.time() - max_age
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+
+class S3BlobStore(BlobStore):
+    name = "s3"
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("boto3 is required for the s3 result blob store")
+
+        self.bucket = bucket
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client_error = ClientError
+        self.not_found = self.client.exceptions.NoSuchKey
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentEncoding="gzip")
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except self.not_found:
+            raise KeyError(key)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self.client_error as e:
+            # Credential, permission and network errors must not look like expiry
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def sweep(self, max_age: int) -> int:
+        cutoff = time.time() - max_age
+        removed = 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix="results/"):
+            for obj in page.get("Contents", []):
+                if obj["LastModified"].timestamp() < cutoff:
+                    self.delete(obj["Key"])
+                    removed += 1
+        return removed
+
+
+@lru_cache(maxsize=None)
+def get_blob_store() -> BlobStore:
+    if settings.RESULT_BLOB_STORE == "s3":
+        return S3BlobStore(settings.RESULT_S3_BUCKET, settings.RESULT_S3_ENDPOINT_URL)
+    return LocalBlobStore(settings.RESULT_BLOB_DIR)
+
+
+def offload_result(task_id: str, result: Dict[str, Any], summary_key: str) -> Dict[str, Any]:
+    """
+    Write compressed results to the blob store and return a small pointer for the
+    result backend, keeping result[summary_key] alongside it
+    """
+    store = get_blob_store()
+    key = f"results/{task_id}.json.gz"
+    data = gzip.compress(json.dumps(result).encode())
+    store.put(key, data)
+    logger.info(f"Offloaded results for {task_id} to {store.name} store ({len(data)} bytes)")
+    return {
+        "result_ref": {"store": store.name, "key": key, "size": len(data)},
+        summary_key: result[summary_key]
+    }
+
+
+def iter_result(result_ref: Dict[str, Any], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Stream decompressed result JSON from the blob store in chunks"""
+    store = get_blob_store()
+    with closing(store.open(result_ref["key"])) as raw:
+        with gzip.GzipFile(fileobj=raw) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
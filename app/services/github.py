@@ -1,4 +1,7 @@
+from app.utils.repo import parse_repo_url
 import aiohttp
+import asyncio
+import time
 from typing import List, Dict, Any, Optional
 import base64
 import logging
@@ -7,6 +10,19 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class GitHubNotFoundError(ValueError):
+    """The repository or pull request does not exist"""
+
+
+class GitHubUpstreamError(ValueError):
+    """GitHub is unavailable, rate limiting us, or unreachable"""
+
+    def __init__(self, message: str, status_code: int = 502, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
 class GitHubService:
     def __init__(self, token: Optional[str] = None):
         self.base_url = "https://api.github.com"
@@ -76,8 +92,7 @@ class GitHubService:
 
     def get_repo_from_url(self, repo_url: str) -> str:
         """Convert GitHub URL to owner/repo format"""
-        parts = repo_url.rstrip("/").split("/")
-        repo = f"{parts[-2]}/{parts[-1]}"
+        repo = parse_repo_url(repo_url)
         logger.info(f"Converted {repo_url} to {repo}")
         return repo
 
@@ -89,14 +104,49 @@ class GitHubService:
                 logger.info(f"Fetching PR details from: {url}")
 
                 async with session.get(url) as response:
+                    if response.status == 404:
+                        raise GitHubNotFoundError(f"Pull request {pr_number} not found in repository {repo}")
+
+                    if response.status == 429 or (
+                            response.status == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+                    ):
+                        raise GitHubUpstreamError(
+                            "GitHub API rate limit exceeded",
+                            status_code=503,
+                            retry_after=self._get_retry_after(response)
+                        )
+
+                    if response.status >= 500:
+                        raise GitHubUpstreamError(
+                            f"GitHub API returned {response.status}",
+                            retry_after=self._get_retry_after(response)
+                        )
+
                     response.raise_for_status()
                     data = await response.json()
                     return {
                         "base_sha": data["base"]["sha"],
                         "head_sha": data["head"]["sha"],
                         "title": data["title"],
-                        "user": data["user"]["login"]
+                        "user": data["user"]["login"],
+                        "changed_files": data.get("changed_files", 0),
+                        "additions": data.get("additions", 0),
+                        "deletions": data.get("deletions", 0)
                     }
+        except (GitHubNotFoundError, GitHubUpstreamError) as e:
+            logger.error(f"Error fetching PR details: {str(e)}")
+            raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            logger.error(f"Error reaching GitHub: {str(e)}")
+            raise GitHubUpstreamError(f"Error reaching GitHub: {str(e)}")
         except Exception as e:
             logger.error(f"Error fetching PR details: {str(e)}")
-            raise ValueError(f"Error fetching PR details: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error fetching PR details: {str(e)}")
+
+    def _get_retry_after(self, response) -> Optional[int]:
+        """Read the retry hint from GitHub's Retry-After or rate limit reset headers"""
+        if response.headers.get("Retry-After", "").isdigit():
+            return int(response.headers["Retry-After"])
+        if response.headers.get("X-RateLimit-Reset", "").isdigit():
+            return max(1, int(response.headers["X-RateLimit-Reset"]) - int(time.time()))
+        return None
@@ -1,4 +1,23 @@
 from app.tasks.celery_app import celery_app
-from app.tasks.review import analyze_pr_task
+import importlib
 
-__all__ = ['celery_app', 'analyze_pr_task']
\ No newline at end of file
+# Task modules are imported lazily so that importing celery_app (e.g. from the
+# API) does not pull in the review agent and its dependencies
+_lazy_tasks = {
+    'analyze_pr_task': 'app.tasks.review',
+    'analyze_batch_task': 'app.tasks.batch',
+    'review_blob_task': 'app.tasks.batch',
+    'assemble_batch_task': 'app.tasks.batch',
+    'sweep_result_blobs': 'app.tasks.maintenance',
+    'release_admission_task': 'app.tasks.maintenance',
+}
+
+
+def __getattr__(name):
+    if name in _lazy_tasks:
+        return getattr(importlib.import_module(_lazy_tasks[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['celery_app', 'analyze_pr_task', 'analyze_batch_task', 'review_blob_task', 'assemble_batch_task',
+           'sweep_result_blobs', 'release_admission_task']
\ No newline at end of file
@@ -0,0 +1,233 @@
+from app.tasks.celery_app import celery_app, ANALYZE_BATCH_TASK, REVIEW_BLOB_TASK, ASSEMBLE_BATCH_TASK
+from app.tasks.review import CodeReviewTask, detect_language, is_reviewable
+from app.core.agent import CodeReviewAgent, FileAnalysis
+from app.services.github import GitHubService
+from app.services.blob_store import offload_result
+from app.tasks.maintenance import release_admission_task
+from app.utils.batch_progress import BatchProgress
+from app.config import settings
+from celery import chord, group
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True, base=CodeReviewTask, name=ANALYZE_BATCH_TASK)
+def analyze_batch_task(
+        self,
+        prs: List[Dict[str, Any]],
+        github_token: Optional[str] = None,
+        admission_id: Optional[str] = None,
+        admission_reservations: Optional[Dict[str, int]] = None
+):
+    """
+    Analyze a batch of GitHub pull requests, reviewing each unique file blob only once.
+
+    Unique blobs are fanned out as review_blob_task subtasks and the per-PR results
+    are collected by assemble_batch_task, which replaces this task so its result is
+    stored under the batch id.
+    """
+    batch_id = self.request.id
+    try:
+        logger.info(f"Starting batch analysis of {len(prs)} PRs")
+        github_service = GitHubService(github_token)
+
+        # Run async code in sync context
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            fetched = loop.run_until_complete(_fetch_batch_metadata(github_service, prs))
+        finally:
+            loop.close()
+
+        blobs, pr_files = _group_blobs(fetched)
+        total_files = sum(len(pr['files']) for pr in pr_files if pr['status'] == 'completed')
+        BatchProgress().start(batch_id, {
+            "total_prs": len(prs),
+            "failed_prs": sum(1 for pr in pr_files if pr['status'] == 'failed'),
+            "total_files": total_files,
+            "unique_files": len(blobs),
+            "reviewed_files": 0
+        })
+        logger.info(f"Batch {batch_id}: {len(blobs)} unique files out of {total_files} across {len(prs)} PRs")
+    except Exception as e:
+        logger.error(f"Error in analyze_batch_task: {str(e)}")
+        self.update_state(
+            state='FAILURE',
+            meta={
+                'exc_type': type(e).__name__,
+                'exc_message': str(e),
+                'task_id': batch_id
+            }
+        )
+        raise
+
+    # Subtasks stay on the queue the batch was routed to
+    queue = (self.request.delivery_info or {}).get('routing_key')
+    options = {"queue": queue} if queue else {}
+    header = group(
+        review_blob_task.si(batch_id, sha, blob['repo'], blob['filename'], blob['head_sha'], github_token).set(**options)
+        for sha, blob in blobs.items()
+    )
+    # The callback releases the admission reservation once the batch is assembled
+    body = assemble_batch_task.s(
+        batch_id,
+        pr_files,
+        admission_id=admission_id,
+        admission_reservations=admission_reservations
+    ).set(**options)
+    # If a header task fails the callback never runs, so release from the chord's errback
+    if admission_reservations:
+        body.link_error(release_admission_task.si(admission_id, admission_reservations).set(**options))
+    return self.replace(chord(header, body))
+
+
+@celery_app.task(bind=True, base=CodeReviewTask, name=REVIEW_BLOB_TASK, acks_late=True)
+def review_blob_task(
+        self,
+        batch_id: str,
+        sha: str,
+        repo: str,
+        filename: str,
+        head_sha: str,
+        github_token: Optional[str] = None
+):
+    """
+    Review a single file blob for a batch
+    """
+    github_service = GitHubService(github_token)
+    agent = CodeReviewAgent()
+
+    # Run async code in sync context
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        analysis = loop.run_until_complete(_review_blob(github_service, agent, repo, filename, head_sha))
+    finally:
+        loop.close()
+
+    BatchProgress().increment(batch_id)
+    return {"sha": sha, "issues": analysis.dict()["issues"] if analysis else None}
+
+
+@celery_app.task(bind=True, base=CodeReviewTask, name=ASSEMBLE_BATCH_TASK)
+def assemble_batch_task(
+        self,
+        reviews: List[Dict[str, Any]],
+        batch_id: str,
+        pr_files: List[Dict[str, Any]],
+        admission_id: Optional[str] = None,
+        admission_reservations: Optional[Dict[str, int]] = None
+):
+    """
+    Assemble per-PR results from the shared blob reviews of a batch
+    """
+    reviewed = {review['sha']: review['issues'] for review in reviews}
+    agent = CodeReviewAgent()
+
+    results = []
+    for pr in pr_files:
+        if pr['status'] == 'failed':
+            results.append(pr)
+            continue
+
+        analyses = [
+            FileAnalysis(file_path=file['filename'], issues=reviewed[file['sha']])
+            for file in pr['files']
+            if reviewed.get(file['sha']) is not None
+        ]
+        results.append({
+            "repo_url": pr['repo_url'],
+            "pr_number": pr['pr_number'],
+            "status": "completed",
+            "files": [analysis.dict() for analysis in analyses],
+            "summary": agent.generate_summary(analyses)
+        })
+
+    progress = BatchProgress().get(batch_id) or {}
+    logger.info(f"Batch {batch_id} complete")
+    result = {"batch_id": batch_id, "progress": progress, "prs": results}
+
+    # Keep only a pointer and the progress counters in the result backend, falling back
+    # to the inline result rather than losing a finished review
+    if settings.RESULT_OFFLOAD_ENABLED:
+        try:
+            return offload_result(batch_id, result, "progress")
+        except Exception as e:
+            logger.error(f"Failed to offload results for {batch_id}: {str(e)}")
+    return result
+
+
+async def _fetch_pr_metadata(github_service, semaphore: asyncio.Semaphore, pr: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch details and changed files for a single PR of the batch"""
+    async with semaphore:
+        repo = None
+        try:
+            repo = github_service.get_repo_from_url(pr['repo_url'])
+            pr_details = await github_service.get_pr_details(repo, pr['pr_number'])
+            files = await github_service.get_pr_files(repo, pr['pr_number'])
+            return {**pr, "repo": repo, "details": pr_details, "files": files}
+        except Exception as e:
+            logger.error(f"Error fetching PR #{pr['pr_number']} in {pr['repo_url']}: {str(e)}")
+            return {**pr, "repo": repo, "error": str(e)}
+
+
+async def _fetch_batch_metadata(github_service, prs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fetch metadata for all PRs of the batch concurrently"""
+    semaphore = asyncio.Semaphore(settings.BATCH_FETCH_CONCURRENCY)
+    return await asyncio.gather(*(_fetch_pr_metadata(github_service, semaphore, pr) for pr in prs))
+
+
+def _group_blobs(fetched: List[Dict[str, Any]]):
+    """
+    Group reviewable files by blob SHA so identical content is reviewed once.
+    Returns the unique blobs and a slim per-PR file listing for assembly.
+    """
+    blobs: Dict[str, Dict[str, Any]] = {}
+    pr_files = []
+    for pr in fetched:
+        if "error" in pr:
+            pr_files.append({
+                "repo_url": pr['repo_url'],
+                "pr_number": pr['pr_number'],
+                "status": "failed",
+                "error": pr['error']
+            })
+            continue
+
+        files = []
+        for file in pr['files']:
+            if not file.get('sha') or not is_reviewable(file):
+                continue
+            files.append({"filename": file['filename'], "sha": file['sha']})
+            blobs.setdefault(file['sha'], {
+                "repo": pr['repo'],
+                "filename": file['filename'],
+                "head_sha": pr['details']['head_sha']
+            })
+
+        pr_files.append({
+            "repo_url": pr['repo_url'],
+            "pr_number": pr['pr_number'],
+            "status": "completed",
+            "files": files
+        })
+    return blobs, pr_files
+
+
+async def _review_blob(github_service, agent, repo: str, filename: str, head_sha: str) -> Optional[FileAnalysis]:
+    content = await github_service.get_file_content(repo, filename, head_sha)
+    if content is None:
+        logger.warning(f"Could not fetch content for {filename}")
+        return None
+
+    language = detect_language(filename)
+    return await agent.review_file(filename, content, language)
+
+
+# Make sure to export the tasks
+__all__ = ['analyze_batch_task', 'review_blob_task', 'assemble_batch_task']
@@ -1,11 +1,19 @@
 from celery import Celery
 from app.config import settings
 
+# Task names, so clients can send tasks without importing worker code
+ANALYZE_PR_TASK = 'app.tasks.review.analyze_pr_task'
+ANALYZE_BATCH_TASK = 'app.tasks.batch.analyze_batch_task'
+REVIEW_BLOB_TASK = 'app.tasks.batch.review_blob_task'
+ASSEMBLE_BATCH_TASK = 'app.tasks.batch.assemble_batch_task'
+SWEEP_RESULT_BLOBS_TASK = 'app.tasks.maintenance.sweep_result_blobs'
+RELEASE_ADMISSION_TASK = 'app.tasks.maintenance.release_admission_task'
+
 celery_app = Celery(
     "code_review",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=['app.tasks.review']
+    include=['app.tasks.review', 'app.tasks.batch', 'app.tasks.maintenance']
 )
 
 # Optional configurations
@@ -15,4 +23,15 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    task_default_queue=settings.SMALL_PR_QUEUE,
+    # Consume queues in the order given to the worker so small PRs skip ahead
+    # and batch subtasks only run when the interactive queues are empty
+    broker_transport_options={'queue_order_strategy': 'priority'},
+    result_expires=settings.RESULT_BLOB_TTL,
+    beat_schedule={
+        'sweep-result-blobs': {
+            'task': SWEEP_RESULT_BLOBS_TASK,
+            'schedule': settings.RESULT_BLOB_SWEEP_INTERVAL,
+        },
+    },
 )
\ No newline at end of file
@@ -0,0 +1,34 @@
+from app.tasks.celery_app import celery_app, SWEEP_RESULT_BLOBS_TASK, RELEASE_ADMISSION_TASK
+from app.services.blob_store import get_blob_store
+from app.utils.admission import AdmissionController
+from app.config import settings
+import logging
+from typing import Dict
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name=SWEEP_RESULT_BLOBS_TASK)
+def sweep_result_blobs():
+    """
+    Delete offloaded review results older than RESULT_BLOB_TTL
+    """
+    removed = get_blob_store().sweep(settings.RESULT_BLOB_TTL)
+    logger.info(f"Swept {removed} expired result blobs")
+    return removed
+
+
+@celery_app.task(name=RELEASE_ADMISSION_TASK)
+def release_admission_task(admission_id: str, admission_reservations: Dict[str, int]):
+    """
+    Release an admission reservation, used as an error callback when a task that
+    holds one fails without running its own release
+    """
+    logger.info(f"Releasing admission {admission_id} after failure")
+    AdmissionController().release(admission_id, admission_reservations)
+
+
+# Make sure to export the tasks
+__all__ = ['sweep_result_blobs', 'release_admission_task']
@@ -1,16 +1,56 @@
-from app.tasks.celery_app import celery_app
-from celery import Task
+from app.tasks.celery_app import celery_app, ANALYZE_PR_TASK
+from celery import Task, states
 from app.core.agent import CodeReviewAgent
 from app.services.github import GitHubService
+from app.services.blob_store import offload_result
+from app.utils.admission import AdmissionController
+from app.config import settings
 import asyncio
 import logging
-from typing import Optional
+from typing import Dict, Optional
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Map of file extensions to the language hint passed to the agent
+LANGUAGE_MAP = {
+    'py': 'python',
+    'js': 'javascript',
+    'java': 'java',
+    'cpp': 'cpp',
+    'ts': 'typescript',
+    'xml': 'xml',
+    'md': 'markdown',
+    'yml': 'yaml',
+    'yaml': 'yaml',
+    'json': 'json'
+}
+
+# Files with more changes than this are skipped
+MAX_FILE_CHANGES = 1000
+
+
+def detect_language(filename: str) -> str:
+    """Determine language from file extension"""
+    extension = filename.split('.')[-1].lower()
+    return LANGUAGE_MAP.get(extension, 'text')
+
+
+def is_reviewable(file: dict) -> bool:
+    """Check whether a file from the PR files listing should be reviewed"""
+    if file.get('status') == 'removed':
+        logger.info(f"Skipping removed file: {file['filename']}")
+        return False
+
+    if int(file.get('changes', 0)) > MAX_FILE_CHANGES:
+        logger.info(f"Skipping large file: {file['filename']} ({file.get('changes')} changes)")
+        return False
+
+    return True
+
+
 class CodeReviewTask(Task):
     abstract = True
 
@@ -22,9 +62,22 @@ class CodeReviewTask(Task):
             "task_id": task_id
         }
 
-
-@celery_app.task(bind=True, base=CodeReviewTask)
-def analyze_pr_task(self, repo_url: str, pr_number: int, github_token: Optional[str] = None):
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        # Release capacity reserved by the API at admission time, unless the task
+        # was replaced and its replacement carries the reservation forward
+        if kwargs.get('admission_reservations') and status != states.IGNORED:
+            AdmissionController().release(kwargs['admission_id'], kwargs['admission_reservations'])
+
+
+@celery_app.task(bind=True, base=CodeReviewTask, name=ANALYZE_PR_TASK)
+def analyze_pr_task(
+        self,
+        repo_url: str,
+        pr_number: int,
+        github_token: Optional[str] = None,
+        admission_id: Optional[str] = None,
+        admission_reservations: Optional[Dict[str, int]] = None
+):
     """
     Analyze a GitHub pull request and return the results
     """
@@ -43,9 +96,18 @@ def analyze_pr_task(self, repo_url: str, pr_number: int, github_token: Optional[
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            return loop.run_until_complete(_analyze_pr(github_service, agent, repo_url, pr_number))
+            result = loop.run_until_complete(_analyze_pr(github_service, agent, repo_url, pr_number))
         finally:
             loop.close()
+
+        # Keep only a pointer and the summary in the result backend, falling back
+        # to the inline result rather than losing a finished review
+        if settings.RESULT_OFFLOAD_ENABLED:
+            try:
+                return offload_result(self.request.id, result, "summary")
+            except Exception as e:
+                logger.error(f"Failed to offload results for {self.request.id}: {str(e)}")
+        return result
     except Exception as e:
         logger.error(f"Error in analyze_pr_task: {str(e)}")
         self.update_state(
@@ -75,12 +137,7 @@ async def _analyze_pr(github_service, agent, repo_url: str, pr_number: int):
         # Analyze each file
         analyses = []
         for file in files:
-            if file.get('status') == 'removed':
-                logger.info(f"Skipping removed file: {file['filename']}")
-                continue
-
-            if int(file.get('changes', 0)) > 1000:
-                logger.info(f"Skipping large file: {file['filename']} ({file.get('changes')} changes)")
+            if not is_reviewable(file):
                 continue
 
             logger.info(f"Fetching content for {file['filename']}")
@@ -90,21 +147,7 @@ async def _analyze_pr(github_service, agent, repo_url: str, pr_number: int):
                 logger.warning(f"Could not fetch content for {file['filename']}")
                 continue
 
-            # Determine language from file extension
-            extension = file['filename'].split('.')[-1].lower()
-            language_map = {
-                'py': 'python',
-                'js': 'javascript',
-                'java': 'java',
-                'cpp': 'cpp',
-                'ts': 'typescript',
-                'xml': 'xml',
-                'md': 'markdown',
-                'yml': 'yaml',
-                'yaml': 'yaml',
-                'json': 'json'
-            }
-            language = language_map.get(extension, 'text')
+            language = detect_language(file['filename'])
             logger.info(f"Analyzing {file['filename']} as {language}")
 
             analysis = await agent.review_file(file['filename'], content, language)
@@ -0,0 +1,180 @@
+from fastapi import HTTPException
+from redis import Redis
+from app.config import settings
+import json
+import logging
+import math
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+# Reservations live in a single ZSET as "<tenant>|<admission_id>|<work>" members
+# scored by their deadline, so the check and the reservation happen atomically and
+# reservations leaked by lost tasks expire on their own.
+#
+# Every tenant is capped at capacity * weight / (active weights + reserve weight),
+# including on its first request. The reserve weight keeps room free for tenants
+# that are not active yet, so a noisy tenant cannot take the whole capacity.
+#
+# KEYS[1]: reservations ZSET
+# ARGV: reservations JSON ({tenant: work}), admission id, capacity, TTL,
+#       tenant weights JSON, default weight, reserve weight
+# Returns {0, "0"} when admitted, {1, load} over capacity, {2, load} over fair share.
+ADMIT_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+
+local request = cjson.decode(ARGV[1])
+local capacity = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local weights = cjson.decode(ARGV[5])
+local default_weight = tonumber(ARGV[6])
+local reserve_weight = tonumber(ARGV[7])
+
+local inflight = {}
+local total = 0
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    local tenant, work = string.match(member, '^(.*)|[^|]*|(%d+)$')
+    inflight[tenant] = (inflight[tenant] or 0) + tonumber(work)
+    total = total + tonumber(work)
+end
+
+local requested = 0
+for _, work in pairs(request) do
+    requested = requested + work
+end
+
+if total + requested > capacity then
+    return {1, tostring((total + requested) / capacity)}
+end
+
+-- Weighted fair share across active tenants plus the reserve for new ones
+local function weight(tenant)
+    return tonumber(weights[tenant]) or default_weight
+end
+local active = {}
+for tenant, _ in pairs(inflight) do active[tenant] = true end
+for tenant, _ in pairs(request) do active[tenant] = true end
+local total_weight = reserve_weight
+for tenant, _ in pairs(active) do
+    total_weight = total_weight + weight(tenant)
+end
+
+for tenant, work in pairs(request) do
+    local current = inflight[tenant] or 0
+    local fair_share = capacity * weight(tenant) / total_weight
+    if current + work > fair_share then
+        return {2, tostring((current + work) / fair_share)}
+    end
+end
+
+for tenant, work in pairs(request) do
+    redis.call('ZADD', KEYS[1], now + ttl, string.format('%s|%s|%d', tenant, ARGV[2], work))
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+return {0, '0'}
+"""
+
+
+class AdmissionController:
+    """
+    Admits review tasks based on broker queue depth and estimated in-flight work.
+
+    In-flight work is tracked per tenant (repository owner) and each tenant is
+    limited to its weighted fair share of the total capacity.
+    """
+
+    DEFAULT_WEIGHT = 1.0
+
+    def __init__(self):
+        self.redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.reservations_key = "admission:reservations"
+        self.admit_script = self.redis.register_script(ADMIT_SCRIPT)
+        # Batch queues hold one message per unique blob, so they get their own limit
+        self.queue_limits = {
+            settings.SMALL_PR_QUEUE: settings.ADMISSION_MAX_QUEUE_DEPTH,
+            settings.LARGE_PR_QUEUE: settings.ADMISSION_MAX_QUEUE_DEPTH,
+            settings.BATCH_QUEUE: settings.ADMISSION_MAX_BATCH_QUEUE_DEPTH,
+            settings.BATCH_LOW_PRIORITY_QUEUE: settings.ADMISSION_MAX_BATCH_QUEUE_DEPTH
+        }
+
+    def get_tenant(self, repo: str) -> str:
+        """Tenant is the owner part of an owner/repo name"""
+        return repo.split("/")[0].lower()
+
+    def estimate_work(self, pr_details: Dict[str, Any]) -> int:
+        """Estimate work units from file count and change volume"""
+        changes = pr_details.get("additions", 0) + pr_details.get("deletions", 0)
+        work = pr_details.get("changed_files", 0) + math.ceil(changes / settings.ADMISSION_LINES_PER_WORK_UNIT)
+        # A single PR is one task, so cap its charge to keep it admissible
+        return min(max(work, 1), settings.ADMISSION_MAX_TASK_WORK)
+
+    def get_max_share(self, tenant: str) -> float:
+        """Largest share a tenant can hold, reached when it is the only active tenant"""
+        weight = self._get_weight(tenant)
+        return settings.ADMISSION_MAX_INFLIGHT_WORK * weight / (weight + settings.ADMISSION_RESERVE_WEIGHT)
+
+    def get_queue(self, work: int) -> str:
+        """Route small PRs to the fast queue so they skip ahead of huge ones"""
+        if work <= settings.ADMISSION_SMALL_PR_WORK:
+            return settings.SMALL_PR_QUEUE
+        return settings.LARGE_PR_QUEUE
+
+    def check_queue_depth(self, queue: str):
+        """Reject when the queue this request is routed to is over its limit"""
+        depth = self.redis.llen(queue)
+        limit = self.queue_limits.get(queue, settings.ADMISSION_MAX_QUEUE_DEPTH)
+        if depth >= limit:
+            logger.warning(f"Rejecting task: {queue} depth {depth} exceeds {limit}")
+            self._reject(503, "Review queue is full. Please try again later.", depth / limit)
+
+    def admit(self, admission_id: str, reservations: Dict[str, int], queue: str):
+        """
+        Atomically check capacity and reserve work for each tenant under admission_id.
+        Raises HTTPException with a Retry-After header when thresholds are crossed.
+        """
+        self.check_queue_depth(queue)
+
+        code, load = self.admit_script(
+            keys=[self.reservations_key],
+            args=[
+                json.dumps(reservations),
+                admission_id,
+                settings.ADMISSION_MAX_INFLIGHT_WORK,
+                settings.ADMISSION_INFLIGHT_TTL,
+                json.dumps(settings.ADMISSION_TENANT_WEIGHTS),
+                self.DEFAULT_WEIGHT,
+                settings.ADMISSION_RESERVE_WEIGHT
+            ]
+        )
+
+        if code == 1:
+            logger.warning(f"Rejecting {admission_id}: in-flight work over capacity")
+            self._reject(503, "Review service is at capacity. Please try again later.", float(load))
+        elif code == 2:
+            logger.warning(f"Rejecting {admission_id}: tenant over its fair share of in-flight work")
+            self._reject(
+                429,
+                "Too much review work in flight for this tenant. Please try again later.",
+                float(load)
+            )
+
+    def release(self, admission_id: str, reservations: Dict[str, int]):
+        """Return reserved capacity once a task has finished"""
+        try:
+            members = [f"{tenant}|{admission_id}|{work}" for tenant, work in reservations.items()]
+            self.redis.zrem(self.reservations_key, *members)
+        except Exception as e:
+            logger.error(f"Failed to release admission {admission_id}: {str(e)}")
+
+    def _get_weight(self, tenant: str) -> float:
+        return settings.ADMISSION_TENANT_WEIGHTS.get(tenant, self.DEFAULT_WEIGHT)
+
+    def _reject(self, status_code: int, detail: str, load: float):
+        retry_after = max(1, math.ceil(settings.ADMISSION_RETRY_AFTER_SECONDS * load))
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
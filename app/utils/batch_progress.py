@@ -0,0 +1,34 @@
+from redis import Redis
+from app.config import settings
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BatchProgress:
+    """Aggregate progress counters for a batch, shared by all of its subtasks"""
+
+    def __init__(self):
+        self.redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.ttl = settings.RESULT_BLOB_TTL
+
+    def get_key(self, batch_id: str) -> str:
+        return f"batch_progress:{batch_id}"
+
+    def start(self, batch_id: str, counters: Dict[str, int]):
+        key = self.get_key(batch_id)
+        self.redis.hset(key, mapping=counters)
+        self.redis.expire(key, self.ttl)
+
+    def increment(self, batch_id: str, field: str = "reviewed_files"):
+        try:
+            self.redis.hincrby(self.get_key(batch_id), field, 1)
+        except Exception as e:
+            logger.error(f"Failed to update progress for batch {batch_id}: {str(e)}")
+
+    def get(self, batch_id: str) -> Optional[Dict[str, int]]:
+        counters = self.redis.hgetall(self.get_key(batch_id))
+        if not counters:
+            return None
+        return {field: int(value) for field, value in counters.items()}
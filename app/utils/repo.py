@@ -0,0 +1,12 @@
+import re
+
+# GitHub owner and repository names
+REPO_PART_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def parse_repo_url(repo_url: str) -> str:
+    """Convert a GitHub URL to owner/repo format, raising ValueError if it is malformed"""
+    parts = repo_url.rstrip("/").split("/")
+    if len(parts) < 2 or not all(REPO_PART_PATTERN.match(part) for part in parts[-2:]):
+        raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
+    return f"{parts[-2]}/{parts[-1]}"
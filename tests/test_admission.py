@@ -0,0 +1,93 @@
+import pytest
+from fastapi import HTTPException
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.config import settings
+from app.utils import admission
+from app.utils.admission import AdmissionController
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        admission.Redis,
+        "from_url",
+        lambda *args, **kwargs: fakeredis.FakeRedis(server=server, decode_responses=True)
+    )
+    monkeypatch.setattr(settings, "ADMISSION_MAX_INFLIGHT_WORK", 100)
+    monkeypatch.setattr(settings, "ADMISSION_RESERVE_WEIGHT", 1.0)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE_DEPTH", 5)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_BATCH_QUEUE_DEPTH", 50)
+    monkeypatch.setattr(settings, "ADMISSION_INFLIGHT_TTL", 3600)
+    monkeypatch.setattr(settings, "ADMISSION_TENANT_WEIGHTS", {})
+    return AdmissionController()
+
+
+def admit_status(controller, admission_id, reservations, queue=settings.SMALL_PR_QUEUE):
+    try:
+        controller.admit(admission_id, reservations, queue)
+        return 200
+    except HTTPException as e:
+        assert "Retry-After" in e.headers
+        return e.status_code
+
+
+def test_lone_tenant_is_capped_on_first_request(controller):
+    # Alone with the reserve, alice's share is 100 * 1 / (1 + 1) = 50
+    assert admit_status(controller, "a1", {"alice": 60}) == 429
+    assert admit_status(controller, "a2", {"alice": 50}) == 200
+    assert admit_status(controller, "a3", {"alice": 1}) == 429
+
+
+def test_new_tenant_gets_a_slot_after_noisy_tenant(controller):
+    assert admit_status(controller, "a1", {"alice": 50}) == 200
+    # bob's share is 100 / 3, and the reserve left room for it
+    assert admit_status(controller, "b1", {"bob": 33}) == 200
+    assert admit_status(controller, "b2", {"bob": 1}) == 429
+
+
+def test_weights_scale_share(controller, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_TENANT_WEIGHTS", {"alice": 3.0})
+    # 100 * 3 / (3 + 1) = 75
+    assert admit_status(controller, "a1", {"alice": 75}) == 200
+    assert admit_status(controller, "a2", {"alice": 1}) == 429
+
+
+def test_over_capacity_returns_503(controller, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_RESERVE_WEIGHT", 0.0)
+    assert admit_status(controller, "a1", {"alice": 60}) == 200
+    assert admit_status(controller, "b1", {"bob": 50}) == 503
+
+
+def test_release_and_expiry_free_capacity(controller, monkeypatch):
+    assert admit_status(controller, "a1", {"alice": 50}) == 200
+    controller.release("a1", {"alice": 50})
+    assert admit_status(controller, "a2", {"alice": 50}) == 200
+
+    # A reservation past its deadline is trimmed on the next admission
+    controller.redis.zadd(controller.reservations_key, {"alice|a2|50": 0})
+    assert admit_status(controller, "a3", {"alice": 50}) == 200
+
+
+def test_multi_tenant_reservation_is_all_or_nothing(controller):
+    assert admit_status(controller, "a1", {"alice": 30}) == 200
+    assert admit_status(controller, "batch", {"bob": 10, "alice": 30}) == 429
+    assert controller.redis.zrange(controller.reservations_key, 0, -1) == ["alice|a1|30"]
+
+
+def test_queue_depth_is_checked_per_queue(controller):
+    controller.redis.rpush(settings.BATCH_LOW_PRIORITY_QUEUE, *range(10))
+    assert admit_status(controller, "a1", {"alice": 1}, settings.SMALL_PR_QUEUE) == 200
+
+    controller.redis.rpush(settings.SMALL_PR_QUEUE, *range(5))
+    assert admit_status(controller, "a2", {"alice": 1}, settings.SMALL_PR_QUEUE) == 503
+    assert admit_status(controller, "a3", {"alice": 1}, settings.BATCH_LOW_PRIORITY_QUEUE) == 200
+
+
+def test_estimate_work_is_capped(controller, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_TASK_WORK", 40)
+    assert controller.estimate_work({"changed_files": 3, "additions": 150, "deletions": 100}) == 5
+    assert controller.estimate_work({"changed_files": 1000}) == 40
@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.services import blob_store
+from app.api.endpoints.github import _stream_results
+
+
+@pytest.fixture(autouse=True)
+def local_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_BLOB_STORE", "local")
+    monkeypatch.setattr(settings, "RESULT_BLOB_DIR", str(tmp_path))
+    blob_store.get_blob_store.cache_clear()
+    yield
+    blob_store.get_blob_store.cache_clear()
+
+
+def render(head, result, summary_key):
+    async def collect():
+        response = await _stream_results(head, result, summary_key)
+        if isinstance(response, dict):
+            return response
+        body = b""
+        async for chunk in response.body_iterator:
+            body += chunk
+        return json.loads(body)
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("summary_key", ["summary", "progress"])
+def test_inline_and_offloaded_results_share_envelope(summary_key):
+    result = {"files": [{"file_path": "main.py", "issues": []}], summary_key: {"total_files": 1}}
+    head = {"status": "completed"}
+
+    inline = render(head, result, summary_key)
+    offloaded = render(head, blob_store.offload_result("task", result, summary_key), summary_key)
+
+    assert inline == offloaded
+    assert inline[summary_key] == {"total_files": 1}
+    assert inline["results"] == result
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Generous compared to a typical ~0.5s, but far below the cost of loading the worker stack
+IMPORT_TIME_BUDGET = 3.0
+
+WORKER_MODULES = [
+    "anthropic",
+    "aiohttp",
+    "app.core.agent",
+    "app.tasks.review",
+    "app.db.session",
+]
+
+# Import the API in a fresh interpreter so modules loaded by other tests don't leak in
+STARTUP_SCRIPT = f"""
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import app.main
+import_time = time.perf_counter() - start
+
+loaded = [name for name in {WORKER_MODULES!r} if name in sys.modules]
+
+import app.tasks
+from app.tasks.celery_app import ANALYZE_PR_TASK
+
+print(json.dumps({{
+    "import_time": import_time,
+    "loaded": loaded,
+    "task_name": app.tasks.analyze_pr_task.name,
+    "expected_task_name": ANALYZE_PR_TASK,
+}}))
+"""
+
+
+@pytest.fixture(scope="module")
+def startup(tmp_path_factory):
+    # Run from a scratch directory so the API's log file doesn't land in the repo
+    cwd = tmp_path_factory.mktemp("startup")
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    completed = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_api_does_not_import_worker_stack(startup):
+    assert startup["loaded"] == []
+
+
+def test_api_import_time_within_budget(startup):
+    assert startup["import_time"] < IMPORT_TIME_BUDGET
+
+
+def test_tasks_resolve_lazily(startup):
+    assert startup["task_name"] == startup["expected_task_name"]